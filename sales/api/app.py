@@ -10,11 +10,26 @@ from sales.api.routes import ROUTES
 from sales.api.middleware import error_middleware, handle_validation_error
 from sales.api.payload import AsyncGenJsonListPayload, JsonPayload
 from sales.config import Config
+from sales.db.schema import sale_table
+from sales.utils.cache import DateRangeCache
 from sales.utils.pg import setup_pg
 
 logger = logging.getLogger(__name__)
 
 
+async def setup_cache(app: web.Application, args: Namespace):
+    app["metrics_cache"] = DateRangeCache(
+        args.metrics_cache_size, args.metrics_cache_ttl
+    )
+
+    # caches to invalidate on writes to the tables, see `listen_cache_invalidation`
+    app["caches"] = {sale_table.name: [app["metrics_cache"]]}
+
+    yield
+
+    app["metrics_cache"].log_stats("Sales metrics")
+
+
 def init_app(args: Namespace, cfg: Config) -> web.Application:
     """
     Initialize aiohttp web server
@@ -31,6 +46,7 @@ def init_app(args: Namespace, cfg: Config) -> web.Application:
     )
     app["config"] = cfg
     app["logger"] = logger
+    app.cleanup_ctx.append(lambda _: setup_cache(app, args=args))
     app.cleanup_ctx.append(lambda _: setup_pg(app, args=args))
 
     # app.add_routes(routes)
@@ -40,8 +40,13 @@ class AsyncGenJsonListPayload(Payload):
     """
     Iterate over AsyncIterable instances to serialize
     the data by parts and send to client
+
+    Serialized rows are buffered up to `CHUNK_SIZE` bytes
+    before being written, to avoid a write call per row.
     """
 
+    CHUNK_SIZE = 64 * 1024
+
     def __init__(
         self,
         value: Any,
@@ -52,21 +57,36 @@ class AsyncGenJsonListPayload(Payload):
         **kwargs: Any,
     ) -> None:
         self.root_object = root_object
-        super().__init__(value, encoding, content_type, *args, **kwargs)
+        super().__init__(
+            value,
+            *args,
+            content_type=content_type,
+            encoding=encoding,
+            **kwargs,
+        )
 
     async def write(self, writer):
-        await writer.write(('{"%s": [' % self.root_object).encode(self._encoding))
-
-        first = True
-        async for row in self._value:
-            if not first:
-                await writer.write(b",")
-            else:
-                first = False
-
-            await writer.write(dumps(row).encode(self._encoding))
-
-        await writer.write(b"]}")
+        chunk = bytearray(('{"%s": [' % self.root_object).encode(self._encoding))
+
+        separator = b""
+        try:
+            async for row in self._value:
+                chunk += separator
+                chunk += dumps(row).encode(self._encoding)
+                separator = b","
+
+                if len(chunk) >= self.CHUNK_SIZE:
+                    await writer.write(bytes(chunk))
+                    chunk.clear()
+        finally:
+            # release resources held by the generator (e.g. pg connection)
+            # even if client has disconnected in the middle of the response
+            aclose = getattr(self._value, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+        chunk += b"]}"
+        await writer.write(bytes(chunk))
 
 
 __all__ = ("JsonPayload", "AsyncGenJsonListPayload")
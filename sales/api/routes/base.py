@@ -2,17 +2,38 @@
     Resource `View` base classes
 """
 
+import json
+
 from aiohttp import web
+from aiomisc import chunk_list
 from aiopg import Pool
 from aiopg.sa import SAConnection
 from aiopg.sa.result import RowProxy
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from datetime import date as datetime_date, datetime
 from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by
 from sqlalchemy.sql import Select
-from sqlalchemy import and_
+from sqlalchemy import (
+    Column,
+    Date,
+    Integer,
+    Numeric,
+    and_,
+    bindparam,
+    cast,
+    func,
+    literal,
+    select,
+    true,
+    tuple_,
+)
 
 from sales.db.schema import product_table, sale_table, sale_item_table
 from sales.api.middleware import format_http_error
+from sales.api.payload import AsyncGenJsonListPayload
+from sales.utils.pg import MAX_QUERY_ARGS, SelectQuery, notify_cache_invalidation
 
 
 class BaseView(web.View):
@@ -37,6 +58,123 @@ class BaseView(web.View):
 
         return row
 
+    async def stream_rows(
+        self,
+        query: Select,
+        serialize: Optional[Callable[[RowProxy], dict]] = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Fetch and serialize rows while the response is being sent.
+
+        Connection is acquired for the lifetime of the generator,
+        i.e. until the last row has been written to the client.
+        """
+
+        serialize = serialize or self.serialize_row
+
+        async with self.pg.acquire() as conn:
+            async for row in SelectQuery(query, conn):
+                yield serialize(row)
+
+    def stream_response(
+        self,
+        query: Select,
+        root_object: str,
+        serialize: Optional[Callable[[RowProxy], dict]] = None,
+    ) -> web.Response:
+        """
+        Respond with `{root_object: [...]}`, where list items are
+        streamed from the database with constant memory usage
+        """
+
+        return web.Response(
+            body=AsyncGenJsonListPayload(
+                self.stream_rows(query, serialize),
+                root_object=root_object,
+            )
+        )
+
+    def get_page_limit(self) -> Optional[int]:
+        """
+        Get page size from `limit` query parameter.
+
+        Returns None if client has not requested pagination at all,
+        i.e. neither `limit` nor `cursor` parameter is specified.
+        """
+
+        params = self.request.rel_url.query
+        if "limit" not in params and "cursor" not in params:
+            return None
+
+        config = self.app["config"]
+        try:
+            limit = int(params.get("limit", config.DEFAULT_PAGE_SIZE))
+        except ValueError:
+            limit = 0
+
+        if not 0 < limit <= config.MAX_PAGE_SIZE:
+            raise format_http_error(
+                web.HTTPBadRequest,
+                f"limit parameter must be an integer from 1 to {config.MAX_PAGE_SIZE}",
+            )
+
+        return limit
+
+    def get_page_cursor(self, *types: Callable[[Any], Any]) -> Optional[List]:
+        """
+        Decode opaque `cursor` query parameter into the key of the last
+        row of the previous page, casting its values with `types`
+        """
+
+        cursor = self.request.rel_url.query.get("cursor")
+        if cursor is None:
+            return None
+
+        try:
+            values = json.loads(urlsafe_b64decode(cursor.encode()))
+            if not isinstance(values, list) or len(values) != len(types):
+                raise ValueError
+
+            return [cast(value) for cast, value in zip(types, values)]
+        except (TypeError, ValueError):
+            raise format_http_error(
+                web.HTTPBadRequest,
+                "specified cursor parameter is not valid",
+            )
+
+    @staticmethod
+    def encode_cursor(values: List) -> str:
+        return urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    async def page_response(
+        self,
+        query: Select,
+        limit: int,
+        root_object: str,
+        make_cursor: Callable[[dict], List],
+        serialize: Optional[Callable[[RowProxy], dict]] = None,
+    ) -> web.Response:
+        """
+        Respond with a single page of `query` results.
+
+        `query` is expected to be ordered by the pagination key and already
+        filtered by the cursor, so the page is read with an index range scan.
+        """
+
+        serialize = serialize or self.serialize_row
+
+        # fetch an extra row to know if there is a next page
+        async with self.pg.acquire() as conn:
+            result = await conn.execute(query.limit(limit + 1))
+            rows = [serialize(row) for row in await result.fetchall()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows.pop()
+            next_cursor = self.encode_cursor(make_cursor(rows[-1]))
+
+        return web.json_response(data={root_object: rows, "next_cursor": next_cursor})
+
     @classmethod
     def convert_client_date(self, date: str) -> str:
         try:
@@ -49,17 +187,94 @@ class BaseView(web.View):
 
 
 class BaseSaleView(BaseView):
+    MAX_ITEMS_PER_INSERT = MAX_QUERY_ARGS // len(sale_item_table.columns)
+
+    @classmethod
+    def make_sales_query(cls) -> Select:
+        """
+        Select sales along with their items aggregated into arrays,
+        so a single query fetches everything needed to render the sales.
+
+        Items are aggregated in a lateral subquery per sale, so filters,
+        ordering and limit applied to the query are served by the sales
+        index instead of aggregating the whole `sale_item` table first.
+
+        Use `BaseSaleView.serialize_sale(row)` to unpack the resulting rows.
+        """
+
+        order_by = sale_item_table.c.product_id
+
+        items = (
+            select(
+                [
+                    func.array_agg(
+                        aggregate_order_by(sale_item_table.c.product_id, order_by)
+                    ).label("product_ids"),
+                    func.array_agg(
+                        aggregate_order_by(sale_item_table.c.quantity, order_by)
+                    ).label("quantities"),
+                ]
+            )
+            .where(sale_item_table.c.sale_id == sale_table.c.sale_id)
+            .correlate(sale_table)
+            .lateral("items")
+        )
+
+        return (
+            select(
+                [
+                    sale_table.c.sale_id,
+                    sale_table.c.date,
+                    sale_table.c.amount,
+                    items.c.product_ids,
+                    items.c.quantities,
+                ]
+            )
+            .select_from(sale_table.outerjoin(items, true()))
+            .order_by(sale_table.c.date, sale_table.c.sale_id)
+        )
+
+    def serialize_sale(self, row: RowProxy) -> dict:
+        sale = self.serialize_row(row)
+        product_ids = sale.pop("product_ids") or ()
+        quantities = sale.pop("quantities") or ()
+
+        sale["items"] = [
+            {"product_id": product_id, "quantity": float(quantity)}
+            for product_id, quantity in zip(product_ids, quantities)
+        ]
+
+        return sale
+
+    def filter_sales_query_by_cursor(self, query: Select) -> Select:
+        """
+        Continue sales listing after the sale encoded in `cursor`,
+        following `(date, sale_id)` order of `make_sales_query`
+        """
+
+        cursor = self.get_page_cursor(self.convert_client_date, int)
+        if cursor is None:
+            return query
+
+        return query.where(
+            tuple_(sale_table.c.date, sale_table.c.sale_id) > tuple_(*cursor)
+        )
+
+    @staticmethod
+    def make_sales_cursor(sale: dict) -> List:
+        return [sale["date"], sale["sale_id"]]
 
     def filter_select_query_by_date(
         self,
         start_date: str,
         end_date: str,
         query: Select,
+        date_column: Column = sale_table.c.date,
     ) -> Select:
         if end_date and not start_date:
             end_date = self.convert_client_date(end_date)
             query = query.where(
-                sale_table.c.date <= end_date,
+                date_column <= end_date,
             )
         else:
             if start_date:
@@ -68,15 +283,25 @@ class BaseSaleView(BaseView):
                     end_date = self.convert_client_date(end_date)
                     query = query.where(
                         and_(
-                            sale_table.c.date >= start_date,
-                            sale_table.c.date <= end_date,
+                            date_column >= start_date,
+                            date_column <= end_date,
                         )
                     )
                 else:
-                    query = query.where(sale_table.c.date >= start_date)
+                    query = query.where(date_column >= start_date)
 
         return query
 
+    def invalidate_metrics(self, *dates: Any) -> None:
+        """
+        Drop cached metrics of intervals containing any of the sale dates.
+
+        Caches of other processes are invalidated by `notify_cache_invalidation`
+        sent along with the write.
+        """
+
+        self.app["metrics_cache"].invalidate(dates)
+
     async def check_if_sale_exists(self, sale_id: int) -> None:
         async with self.pg.acquire() as conn:
             query = sale_table.select().where(sale_table.c.sale_id == sale_id)
@@ -86,20 +311,148 @@ class BaseSaleView(BaseView):
             if not sale:
                 raise web.HTTPNotFound
 
-    async def get_product(self, product_id: int, conn: SAConnection) -> float:
-        query = product_table.select().where(product_table.c.product_id == product_id)
-        result = await conn.execute(query)
-        product = await result.fetchone()
+    @staticmethod
+    def merge_sale_items(items: List[dict]) -> Dict[int, Decimal]:
+        """
+        Sum quantities of items referring to the same product,
+        as there is a single `sale_item` row per product within a sale
+        """
+
+        quantities = {}
+        for item in items:
+            product_id = item["product_id"]
+            quantity = Decimal(str(item["quantity"]))
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+
+        return quantities
+
+    async def get_products_prices(
+        self, product_ids: Iterable[int], conn: SAConnection
+    ) -> Dict[int, Decimal]:
+        """
+        Fetch prices of all the specified products at once.
+
+        Raises HTTPNotFound listing every product_id that does not exist.
+        """
+
+        product_ids = list(product_ids)
+        prices = {}
+
+        for chunk in chunk_list(product_ids, MAX_QUERY_ARGS):
+            query = select([product_table.c.product_id, product_table.c.price]).where(
+                product_table.c.product_id.in_(chunk)
+            )
+            result = await conn.execute(query)
+            for row in await result.fetchall():
+                prices[row["product_id"]] = row["price"]
+
+        missing_product_ids = [
+            product_id for product_id in product_ids if product_id not in prices
+        ]
+        if missing_product_ids:
+            raise format_http_error(
+                web.HTTPNotFound,
+                "Products with specified product_id do not exist",
+                {"product_ids": missing_product_ids},
+            )
+
+        return prices
+
+    @staticmethod
+    def make_create_sale_query(date: str, quantities: Dict[int, Decimal]) -> Select:
+        """
+        Insert a sale along with its items and computed amount
+        within a single statement, returning `sale_id` and `amount`.
+
+        Nothing is inserted and no rows are returned,
+        if any of the products does not exist.
+        """
+
+        unnested = (
+            func.unnest(
+                cast(bindparam("product_ids", list(quantities)), ARRAY(Integer)),
+                cast(
+                    bindparam("quantities", list(quantities.values())), ARRAY(Numeric)
+                ),
+            )
+            .table_valued("product_id", "quantity")
+            .render_derived("unnested")
+        )
+        items = select([unnested.c.product_id, unnested.c.quantity]).cte("items")
+
+        new_sale = (
+            sale_table.insert()
+            .from_select(
+                ["date", "amount"],
+                select(
+                    [
+                        cast(literal(date), Date),
+                        func.coalesce(
+                            func.sum(product_table.c.price * items.c.quantity), 0
+                        ),
+                    ]
+                )
+                .select_from(
+                    items.join(
+                        product_table,
+                        product_table.c.product_id == items.c.product_id,
+                    )
+                )
+                .having(
+                    func.count()
+                    == select([func.count()]).select_from(items).scalar_subquery()
+                ),
+            )
+            .returning(sale_table.c.sale_id, sale_table.c.amount)
+            .cte("new_sale")
+        )
+
+        new_items = (
+            sale_item_table.insert()
+            .from_select(
+                ["sale_id", "product_id", "quantity"],
+                select([new_sale.c.sale_id, items.c.product_id, items.c.quantity]),
+            )
+            .cte("new_items")
+        )
+
+        return select([new_sale.c.sale_id, new_sale.c.amount]).add_cte(new_items)
+
+    async def create_sale(self, data: dict) -> dict:
+        quantities = self.merge_sale_items(data.get("items"))
+        date = self.convert_client_date(data.get("date"))
+        query = self.make_create_sale_query(date, quantities)
+
+        async with self.pg.acquire() as conn:
+            result = await conn.execute(query)
+            sale = await result.fetchone()
+
+            if sale is None:
+                # find out which products do not exist to report them
+                await self.get_products_prices(quantities, conn)
+                raise web.HTTPNotFound
+
+            await notify_cache_invalidation(conn, sale_table.name, [date])
 
-        if not product:
-            raise web.HTTPNotFound
+        self.invalidate_metrics(date)
 
-        return product
+        data.update({"sale_id": sale["sale_id"]})
+        data.update({"amount": sale["amount"]})
+        return data
 
     async def update_sale(self, data: dict, sale_id: int) -> int:
-        amount = 0
+        quantities = self.merge_sale_items(data.get("items"))
+        date = self.convert_client_date(data.get("date"))
+
         async with self.pg.acquire() as conn:
             async with conn.begin() as _:
+                # look products up before taking the lock, so it is held
+                # only for the time of the writes
+                prices = await self.get_products_prices(quantities, conn)
+                amount = sum(
+                    prices[product_id] * quantity
+                    for product_id, quantity in quantities.items()
+                )
 
                 # set advisory lock for the transaction isolation
                 # so another transaction would wait until this transaction proceeds
@@ -110,29 +463,36 @@ class BaseSaleView(BaseView):
                 )
                 await conn.execute(query)
 
-                for item in data.get("items"):
-                    product = await self.get_product(item.get("product_id"), conn)
-
-                    amount += product.get("price") * Decimal(item.get("quantity"))
-
-                    query = sale_item_table.insert().values(
-                        {
-                            "sale_id": sale_id,
-                            "product_id": product.get("product_id"),
-                            "quantity": item.get("quantity"),
-                        }
-                    )
-                    await conn.execute(query)
+                sale_items_rows = [
+                    {
+                        "sale_id": sale_id,
+                        "product_id": product_id,
+                        "quantity": quantity,
+                    }
+                    for product_id, quantity in quantities.items()
+                ]
+                for chunk in chunk_list(sale_items_rows, self.MAX_ITEMS_PER_INSERT):
+                    await conn.execute(sale_item_table.insert().values(chunk))
 
+                # join the sale to itself to return the date it had before
+                old_sale = sale_table.alias("old_sale")
                 query = (
                     sale_table.update()
-                    .where(sale_table.c.sale_id == sale_id)
-                    .values(
-                        date=self.convert_client_date(data.get("date")),
-                        amount=amount,
+                    .where(
+                        and_(
+                            sale_table.c.sale_id == sale_id,
+                            old_sale.c.sale_id == sale_table.c.sale_id,
+                        )
                     )
+                    .values(date=date, amount=amount)
+                    .returning(old_sale.c.date)
                 )
-                await conn.execute(query)
+                result = await conn.execute(query)
+                old_date = await result.scalar()
+
+                await notify_cache_invalidation(conn, sale_table.name, [old_date, date])
+
+        self.invalidate_metrics(old_date, date)
 
         data.update({"sale_id": sale_id})
         data.update({"amount": amount})
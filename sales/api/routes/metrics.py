@@ -8,13 +8,21 @@ from typing import List, Dict
 from sales.api.schema import (
     SaleSchema,
 )
-from sales.db.schema import sale_table
+from sales.db.schema import sale_daily_rollup_table
 from sales.utils.pg import SelectQuery
 
 from .base import BaseSaleView
 
 
 class MetricsView(BaseSaleView):
+    """
+    Metrics are calculated from `sale_daily_rollup`, so response time
+    depends on the number of days within the interval, not sales.
+
+    Calculated metrics are cached per interval until a sale within
+    the interval is recorded or changed, see `BaseSaleView.invalidate_metrics`
+    """
+
     URL_PATH = r"/sales/metrics"
 
     def format_sales_trends(self, sales_trends: List) -> Dict:
@@ -24,26 +32,23 @@ class MetricsView(BaseSaleView):
 
         return result
 
-    @docs(
-        summary="Get metrics details. Use parameters start_date=dd.mm.yyyy and/or end_date=dd.mm.yyyy to set interval"
-    )
-    @response_schema(SaleSchema(), code=HTTPStatus.OK.value)
-    async def get(self):
-        params = self.request.rel_url.query
-        start_date, end_date = (
-            params.get("start_date"),
-            params.get("end_date"),
-        )
+    async def calculate_metrics(self, start_date: str, end_date: str) -> Dict:
+        rollup = sale_daily_rollup_table
 
         async with self.pg.acquire() as conn:
+            total_sales = func.sum(rollup.c.total_sales)
             query = select(
                 [
-                    func.sum(sale_table.c.amount).label("total_sales"),
-                    func.avg(sale_table.c.amount).label("average_sales"),
+                    total_sales.label("total_sales"),
+                    (total_sales / func.sum(rollup.c.sales_count)).label(
+                        "average_sales"
+                    ),
                 ]
-            ).select_from(sale_table)
+            ).select_from(rollup)
 
-            query = self.filter_select_query_by_date(start_date, end_date, query)
+            query = self.filter_select_query_by_date(
+                start_date, end_date, query, rollup.c.date
+            )
 
             result = await conn.execute(query)
             total_sales, average_sales = self.serialize_row(
@@ -53,24 +58,50 @@ class MetricsView(BaseSaleView):
             query = (
                 select(
                     [
-                        extract("year", sale_table.c.date).label("year"),
-                        func.sum(sale_table.c.amount).label("total_sales"),
+                        extract("year", rollup.c.date).label("year"),
+                        func.sum(rollup.c.total_sales).label("total_sales"),
                     ]
                 )
-                .select_from(sale_table)
+                .select_from(rollup)
                 .group_by("year")
             )
 
-            query = self.filter_select_query_by_date(start_date, end_date, query)
-            result = await conn.execute(query)
+            query = self.filter_select_query_by_date(
+                start_date, end_date, query, rollup.c.date
+            )
             sales_trends = [
                 self.serialize_row(row) async for row in SelectQuery(query, conn)
             ]
 
-        return web.json_response(
-            data={
-                "total_sales": total_sales,
-                "average_sales": average_sales,
-                "sales_trends": self.format_sales_trends(sales_trends),
-            }
+        return {
+            "total_sales": total_sales,
+            "average_sales": average_sales,
+            "sales_trends": self.format_sales_trends(sales_trends),
+        }
+
+    @docs(
+        summary="Get metrics details. Use parameters start_date=dd.mm.yyyy and/or end_date=dd.mm.yyyy to set interval"
+    )
+    @response_schema(SaleSchema(), code=HTTPStatus.OK.value)
+    async def get(self):
+        params = self.request.rel_url.query
+        start_date, end_date = (
+            params.get("start_date"),
+            params.get("end_date"),
         )
+
+        cache = self.app["metrics_cache"]
+        key = cache.make_key(
+            *(
+                self.convert_client_date(date) if date else None
+                for date in (start_date, end_date)
+            )
+        )
+
+        metrics = cache.get(key)
+        if metrics is None:
+            generation = cache.generation
+            metrics = await self.calculate_metrics(start_date, end_date)
+            cache.set(key, metrics, generation)
+
+        return web.json_response(data=metrics)
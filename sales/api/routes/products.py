@@ -11,7 +11,7 @@ from sales.api.schema import (
     ProductsResponseSchema,
 )
 from sales.db.schema import product_table
-from sales.utils.pg import MAX_QUERY_ARGS, SelectQuery
+from sales.utils.pg import MAX_QUERY_ARGS, notify_cache_invalidation
 
 from .base import BaseView
 
@@ -33,15 +33,30 @@ class ProductsView(BaseView):
                 "price": product["price"],
             }
 
-    @docs(summary="Get a list of all products")
+    @docs(
+        summary=(
+            "Get a list of all products. Use parameter limit to get products "
+            "page by page, passing next_cursor of the response as cursor parameter"
+        )
+    )
     @response_schema(ProductsResponseSchema(), code=HTTPStatus.OK.value)
     async def get(self):
-        query = product_table.select()
+        query = product_table.select().order_by(product_table.c.product_id)
 
-        async with self.pg.acquire() as conn:
-            data = [self.serialize_row(row) async for row in SelectQuery(query, conn)]
+        limit = self.get_page_limit()
+        if limit is None:
+            return self.stream_response(query, "products")
+
+        cursor = self.get_page_cursor(int)
+        if cursor is not None:
+            query = query.where(product_table.c.product_id > cursor[0])
 
-        return web.json_response(data={"products": data})
+        return await self.page_response(
+            query,
+            limit,
+            "products",
+            lambda product: [product["product_id"]],
+        )
 
     @docs(summary="Add a list of products")
     @request_schema(ProductsSchema())
@@ -60,4 +75,6 @@ class ProductsView(BaseView):
                 for chunk in chunked_products_rows:
                     await conn.execute(insert(product_table).values(chunk))
 
+                await notify_cache_invalidation(conn, product_table.name)
+
         return web.Response(status=HTTPStatus.CREATED, content_type="application/json")
@@ -1,14 +1,12 @@
 from aiohttp import web
 from aiohttp_apispec import docs, request_schema, response_schema
 from http import HTTPStatus
-from sqlalchemy import select
 
 from sales.api.schema import (
     BaseSaleSchema,
     SaleSchema,
 )
-from sales.db.schema import sale_table, sale_item_table
-from sales.utils.pg import SelectQuery
+from sales.db.schema import sale_table
 
 from .base import BaseSaleView
 
@@ -23,33 +21,15 @@ class SaleView(BaseSaleView):
     @docs(summary="Get details about a sale")
     @response_schema(SaleSchema(), code=HTTPStatus.OK.value)
     async def get(self):
-        await self.check_if_sale_exists(self.sale_id)
-
         async with self.pg.acquire() as conn:
-            query = sale_table.select().where(sale_table.c.sale_id == self.sale_id)
+            query = self.make_sales_query().where(sale_table.c.sale_id == self.sale_id)
             result = await conn.execute(query)
-            sale = self.serialize_row(await result.fetchone())
+            row = await result.fetchone()
 
-            query = (
-                select(
-                    [
-                        sale_item_table.c.product_id,
-                        sale_item_table.c.quantity,
-                    ]
-                )
-                .select_from(sale_item_table)
-                .where(sale_item_table.c.sale_id == sale.get("sale_id"))
-            )
-            sale.update(
-                {
-                    "items": [
-                        self.serialize_row(row)
-                        async for row in SelectQuery(query, conn)
-                    ]
-                }
-            )
+        if not row:
+            raise web.HTTPNotFound
 
-        return web.json_response(data=sale)
+        return web.json_response(data=self.serialize_sale(row))
 
     @docs(
         summary="Change sale data",
@@ -1,15 +1,12 @@
 from aiohttp import web
 from aiohttp_apispec import docs, request_schema, response_schema
 from http import HTTPStatus
-from sqlalchemy import select
 
 from sales.api.schema import (
     BaseSaleSchema,
     GetSalesResponseSchema,
     SaleSchema,
 )
-from sales.db.schema import sale_table, sale_item_table
-from sales.utils.pg import SelectQuery
 
 from .base import BaseSaleView
 
@@ -17,7 +14,13 @@ from .base import BaseSaleView
 class SalesView(BaseSaleView):
     URL_PATH = r"/sales"
 
-    @docs(summary="Get a list of all sales")
+    @docs(
+        summary=(
+            "Get a list of all sales. Use parameters start_date=dd.mm.yyyy and/or "
+            "end_date=dd.mm.yyyy to set interval. Use parameter limit to get sales "
+            "page by page, passing next_cursor of the response as cursor parameter"
+        )
+    )
     @response_schema(GetSalesResponseSchema(), code=HTTPStatus.OK.value)
     async def get(self):
         params = self.request.rel_url.query
@@ -26,35 +29,23 @@ class SalesView(BaseSaleView):
             params.get("end_date"),
         )
 
-        async with self.pg.acquire() as conn:
-            query = self.filter_select_query_by_date(
-                start_date,
-                end_date,
-                sale_table.select(),
-            )
+        query = self.filter_select_query_by_date(
+            start_date,
+            end_date,
+            self.make_sales_query(),
+        )
 
-            sales = [self.serialize_row(row) async for row in SelectQuery(query, conn)]
-            for sale in sales:
-                query = (
-                    select(
-                        [
-                            sale_item_table.c.product_id,
-                            sale_item_table.c.quantity,
-                        ]
-                    )
-                    .select_from(sale_item_table)
-                    .where(sale_item_table.c.sale_id == sale.get("sale_id"))
-                )
-                sale.update(
-                    {
-                        "items": [
-                            self.serialize_row(row)
-                            async for row in SelectQuery(query, conn)
-                        ]
-                    }
-                )
+        limit = self.get_page_limit()
+        if limit is None:
+            return self.stream_response(query, "sales", self.serialize_sale)
 
-        return web.json_response(data={"sales": sales})
+        return await self.page_response(
+            self.filter_sales_query_by_cursor(query),
+            limit,
+            "sales",
+            self.make_sales_cursor,
+            self.serialize_sale,
+        )
 
     @docs(
         summary="Record a new sale",
@@ -69,27 +60,7 @@ class SalesView(BaseSaleView):
     async def post(self):
         data = await self.request.json()
 
-        async with self.pg.acquire() as conn:
-            """
-            Important:
-                Generated record has amount field equal to 0.
-                Call `SalesView.make_select_table_rows(sale_items, sale_id, conn)`
-                to update amount value.
-            """
-            query = (
-                sale_table.insert()
-                .values(
-                    {
-                        "date": self.convert_client_date(data.get("date")),
-                        "amount": 0,
-                    }
-                )
-                .returning(sale_table.c.sale_id)
-            )
-            result = await conn.execute(query)
-            sale_id = await result.scalar()
-
-        sale = await self.update_sale(data, sale_id)
+        sale = await self.create_sale(data)
 
         return web.json_response(
             data=self.serialize_row(sale), status=HTTPStatus.CREATED.value
@@ -35,6 +35,7 @@ class ProductsResponseSchema(Schema):
         many=True,
         required=True,
     )
+    next_cursor = Str(allow_none=True)
 
 
 class SaleItemsSchema(Schema):
@@ -71,6 +72,7 @@ class SaleSchema(BaseSaleSchema):
 
 class GetSalesResponseSchema(Schema):
     sales = Nested(SaleSchema, many=True, required=True)
+    next_cursor = Str(allow_none=True)
 
 
 class MetricsSchema(Schema):
@@ -39,6 +39,14 @@ class Config:
     DATE_FORMAT = "%d.%m.%Y"
     MAX_PRODUCT_INSTANCES_WITHIN_IMPORT = 10_000
 
+    # pagination variables
+    DEFAULT_PAGE_SIZE = 100
+    MAX_PAGE_SIZE = 10_000
+
+    # cache variables
+    METRICS_CACHE_SIZE = 128
+    METRICS_CACHE_TTL = 60
+
 
 class DebugConfig(Config):
     DEBUG = True
@@ -1,13 +1,39 @@
 import os
+from argparse import _SubParsersAction
 from alembic.config import CommandLine, Config
 from sales.config import Config as sales_cfg
+from sales.db.rollup import check_rollup
 from pathlib import Path
 
 PROJECT_PATH = Path(__file__).parent.parent.resolve()
 
 
+def add_commands(alembic: CommandLine) -> None:
+    """
+    Register sales specific commands along with alembic ones.
+
+    Commands follow alembic convention: they are called with alembic config
+    and arguments listed in `cmd` default of the subparser.
+    """
+
+    subparsers = next(
+        action
+        for action in alembic.parser._actions
+        if isinstance(action, _SubParsersAction)
+    )
+
+    parser = subparsers.add_parser("rollup", help=check_rollup.__doc__.strip())
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Rebuild sale_daily_rollup from sales before validating it",
+    )
+    parser.set_defaults(cmd=(check_rollup, [], ["rebuild"]))
+
+
 def main() -> None:
     alembic = CommandLine()
+    add_commands(alembic)
     alembic.parser.add_argument(
         "--pg-url",
         default=os.getenv("SALES_PG_URL", sales_cfg.DATABASE_URI),
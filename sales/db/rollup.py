@@ -0,0 +1,94 @@
+"""
+    Consistency check of `sale_daily_rollup`, maintained by triggers on `sale`
+"""
+
+from alembic.config import Config
+from alembic.util import CommandError
+from sqlalchemy import create_engine, func, or_, select
+from sqlalchemy.sql import Select
+
+from sales.db.schema import sale_table, sale_daily_rollup_table
+
+
+def make_expected_rollup_query() -> Select:
+    return select(
+        [
+            sale_table.c.date,
+            func.count().label("sales_count"),
+            func.sum(sale_table.c.amount).label("total_sales"),
+        ]
+    ).group_by(sale_table.c.date)
+
+
+def make_rollup_mismatches_query() -> Select:
+    """
+    Select days where the rollup differs from the aggregated sales
+    """
+
+    expected = make_expected_rollup_query().subquery("expected")
+    actual = sale_daily_rollup_table
+
+    return (
+        select(
+            [
+                func.coalesce(expected.c.date, actual.c.date).label("date"),
+                expected.c.sales_count.label("expected_sales_count"),
+                actual.c.sales_count.label("actual_sales_count"),
+                expected.c.total_sales.label("expected_total_sales"),
+                actual.c.total_sales.label("actual_total_sales"),
+            ]
+        )
+        .select_from(
+            expected.outerjoin(actual, expected.c.date == actual.c.date, full=True)
+        )
+        .where(
+            or_(
+                expected.c.sales_count.is_distinct_from(actual.c.sales_count),
+                expected.c.total_sales.is_distinct_from(actual.c.total_sales),
+            )
+        )
+        .order_by("date")
+    )
+
+
+def check_rollup(config: Config, rebuild: bool = False) -> None:
+    """
+    Validate sale_daily_rollup against sales, or rebuild it from scratch
+    """
+
+    engine = create_engine(config.get_main_option("sqlalchemy.url"))
+
+    try:
+        with engine.begin() as conn:
+            if rebuild:
+                # block sales writes, so they are not lost while rebuilding
+                conn.execute(f"LOCK TABLE {sale_table.name} IN SHARE MODE")
+                conn.execute(sale_daily_rollup_table.delete())
+                conn.execute(
+                    sale_daily_rollup_table.insert().from_select(
+                        ["date", "sales_count", "total_sales"],
+                        make_expected_rollup_query(),
+                    )
+                )
+
+            mismatches = conn.execute(make_rollup_mismatches_query()).fetchall()
+    finally:
+        engine.dispose()
+
+    for mismatch in mismatches:
+        config.print_stdout(
+            "%s: sales_count %s != %s, total_sales %s != %s",
+            mismatch["date"],
+            mismatch["actual_sales_count"],
+            mismatch["expected_sales_count"],
+            mismatch["actual_total_sales"],
+            mismatch["expected_total_sales"],
+        )
+
+    if mismatches:
+        raise CommandError(
+            f"{sale_daily_rollup_table.name} is inconsistent on {len(mismatches)} "
+            "day(s), run with --rebuild to fix it"
+        )
+
+    config.print_stdout(f"{sale_daily_rollup_table.name} is consistent")
@@ -7,6 +7,7 @@ from sqlalchemy import (
     String,
     Numeric,
     Date,
+    Index,
 )
 
 
@@ -35,6 +36,8 @@ sale_table = Table(
     Column("sale_id", Integer, primary_key=True),
     Column("date", Date, nullable=False),
     Column("amount", Numeric, nullable=False),
+    # serves date range filters as well as (date, sale_id) keyset pagination
+    Index(None, "date", "sale_id"),
 )
 
 product_table = Table(
@@ -52,4 +55,15 @@ sale_item_table = Table(
     Column("product_id", Integer, ForeignKey("product.product_id"), primary_key=True),
     # Numeric for a case, when product is not discret
     Column("quantity", Numeric, nullable=False),
+    # primary key covers lookups by sale_id only, product_id needs its own index
+    Index(None, "product_id"),
+)
+
+# Sales aggregated per day, maintained by triggers on `sale` table
+sale_daily_rollup_table = Table(
+    "sale_daily_rollup",
+    metadata,
+    Column("date", Date, primary_key=True),
+    Column("sales_count", Integer, nullable=False),
+    Column("total_sales", Numeric, nullable=False),
 )
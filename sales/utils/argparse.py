@@ -29,6 +29,8 @@ def validate(type: Callable, constraint: Callable) -> Callable:
 Type validation handlers:
 """
 positive_int = validate(int, lambda x: x > 0)
+non_negative_int = validate(int, lambda x: x >= 0)
+positive_float = validate(float, lambda x: x > 0)
 
 
 def get_arg_parser(cfg: Config = None) -> ArgumentParser:
@@ -89,6 +91,20 @@ def get_arg_parser(cfg: Config = None) -> ArgumentParser:
         help="Maximum database async connections",
     )
 
+    group = parser.add_argument_group("Cache options")
+    group.add_argument(
+        "--metrics-cache-size",
+        type=non_negative_int,
+        default=cfg.METRICS_CACHE_SIZE,
+        help="Maximum number of date ranges of sales metrics to cache, 0 disables cache",
+    )
+    group.add_argument(
+        "--metrics-cache-ttl",
+        type=positive_float,
+        default=cfg.METRICS_CACHE_TTL,
+        help="Seconds cached sales metrics are served for",
+    )
+
     group = parser.add_argument_group("Logging options")
     group.add_argument(
         "--log-level",
@@ -0,0 +1,127 @@
+"""
+    In-process caches of API responses
+"""
+
+import logging
+
+from collections import OrderedDict
+from datetime import date
+from time import monotonic
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DateRange = Tuple[Optional[date], Optional[date]]
+
+
+class TTLCache:
+    """
+    Bounded mapping, evicting the least recently used entry when full
+    and expiring entries `ttl` seconds after they were stored.
+
+    Writers may change the underlying data while a value is being computed,
+    so values are stored only if the cache was not invalidated since
+    the `generation` observed before the computation started.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= monotonic():
+            del self._entries[key]
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: int) -> None:
+        if self.maxsize <= 0 or generation != self.generation:
+            return
+
+        self._entries[key] = (monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        self.generation += 1
+
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                self.stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        self.generation += 1
+        self.stats["invalidations"] += len(self._entries)
+        self._entries.clear()
+
+    def log_stats(self, name: str) -> None:
+        stats: Dict[str, int] = dict(self.stats, size=len(self))
+        logger.info(
+            "%s cache: %s",
+            name,
+            ", ".join(f"{stat}={value}" for stat, value in stats.items()),
+        )
+
+
+class DateRangeCache(TTLCache):
+    """
+    `TTLCache` keyed by date ranges, where either bound may be open.
+
+    Writes invalidate only the ranges containing dates they touched.
+    """
+
+    @staticmethod
+    def make_key(
+        start_date: Optional[Union[date, str]], end_date: Optional[Union[date, str]]
+    ) -> DateRange:
+        """
+        Normalize ISO formatted bounds, so equal ranges share an entry
+        """
+
+        return tuple(
+            date.fromisoformat(bound) if isinstance(bound, str) else bound
+            for bound in (start_date, end_date)
+        )
+
+    def invalidate(self, dates: Iterable[Union[date, str]]) -> None:
+        dates = [self.make_key(value, None)[0] for value in dates]
+
+        # concurrent computations may cover the dates as well
+        self.generation += 1
+
+        stale = [
+            key
+            for key in self._entries
+            if any(
+                (key[0] is None or key[0] <= value)
+                and (key[1] is None or value <= key[1])
+                for value in dates
+            )
+        ]
+        for key in stale:
+            del self._entries[key]
+
+        self.stats["invalidations"] += len(stale)
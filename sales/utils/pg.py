@@ -1,6 +1,13 @@
+import asyncio
+import json
 import logging
 import os
 
+from itertools import count
+
+import aiopg
+import psycopg2
+
 from aiohttp import web
 from aiopg.sa import create_engine, SAConnection
 from alembic.config import Config as AlembicConfig
@@ -10,7 +17,7 @@ from pathlib import Path
 from sqlalchemy.sql import Select
 from sqlalchemy.sql.functions import Function
 from sqlalchemy import Column, Numeric, cast, func
-from typing import Union
+from typing import Iterable, Optional, Union
 from types import SimpleNamespace
 
 logger = logging.getLogger(__name__)
@@ -19,6 +26,10 @@ CENSORED = "*****"
 MAX_QUERY_ARGS = 32767
 PROJECT_PATH = Path(__file__).parent.parent.resolve()
 
+CACHE_INVALIDATION_CHANNEL = "cache_invalidation"
+LISTEN_KEEPALIVE_INTERVAL = 30
+LISTEN_RECONNECT_MAX_DELAY = 30
+
 
 def rounded(column: Column, fraction: int = 2) -> Function:
     return func.round(cast(column, Numeric), fraction)
@@ -42,19 +53,104 @@ async def setup_pg(app: web.Application, args: Namespace):
     async with engine.acquire() as conn:
         await conn.execute("SELECT 1")
         logger.info(f"Connected to database: {db_info}")
-        datestyle = "GERMAN, DMY"  # TODO: unhardcode to something like app["cfg"].PG_DATE_FORMAT
-        await conn.execute(f"SET datestyle = '{datestyle}'")
-        logger.info(f"Database date style set to: {datestyle}")
+
+    listener = asyncio.create_task(listen_cache_invalidation(app, args))
 
     try:
         yield
     finally:
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+
         logger.info(f"Disconnecting from database: {db_info}")
         engine.close()
         await engine.wait_closed()
         logger.info(f"Disconnected from database: {db_info}")
 
 
+async def notify_cache_invalidation(
+    conn: SAConnection, table: str, keys: Optional[Iterable] = None
+) -> None:
+    """
+    Ask every API process to invalidate its caches of `table` data.
+
+    Within a transaction the notification is delivered on commit.
+    `keys` are passed to `invalidate` of the caches, all entries are
+    dropped if they are not specified.
+    """
+
+    payload = {"table": table, "keys": None if keys is None else list(keys)}
+    await conn.execute(
+        "SELECT pg_notify(%s, %s)",
+        (CACHE_INVALIDATION_CHANNEL, json.dumps(payload, default=str)),
+    )
+
+
+def invalidate_caches(app: web.Application, payload: str) -> None:
+    try:
+        notification = json.loads(payload)
+        caches = app["caches"].get(notification["table"], ())
+        keys = notification["keys"]
+    except (ValueError, KeyError, TypeError):
+        logger.warning(f"Ignoring malformed cache invalidation: {payload!r}")
+        return
+
+    for cache in caches:
+        if keys is None:
+            cache.clear()
+        else:
+            cache.invalidate(keys)
+
+
+async def listen_cache_invalidation(app: web.Application, args: Namespace):
+    """
+    Invalidate caches of this process on writes made by any process.
+
+    Notifications sent while the connection is lost are missed,
+    so all caches are cleared every time the listener (re)connects.
+    """
+
+    delay = 1
+    while True:
+        try:
+            async with aiopg.connect(
+                dbname=args.pg_url.name,
+                user=args.pg_url.user,
+                password=args.pg_url.password,
+                host=args.pg_url.host,
+                port=args.pg_url.port,
+            ) as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(f"LISTEN {CACHE_INVALIDATION_CHANNEL}")
+
+                    for caches in app["caches"].values():
+                        for cache in caches:
+                            cache.clear()
+
+                    logger.debug("Listening for cache invalidations")
+                    delay = 1
+
+                    while True:
+                        try:
+                            notify = await asyncio.wait_for(
+                                conn.notifies.get(), LISTEN_KEEPALIVE_INTERVAL
+                            )
+                        except asyncio.TimeoutError:
+                            # make sure the connection is still alive
+                            await cur.execute("SELECT 1")
+                            continue
+
+                        invalidate_caches(app, notify.payload)
+        except (psycopg2.Error, OSError, asyncio.TimeoutError) as exc:
+            logger.warning(
+                f"Cache invalidation listener disconnected: {exc!r}, "
+                f"reconnecting in {delay}s"
+            )
+
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, LISTEN_RECONNECT_MAX_DELAY)
+
+
 def make_alembic_config(
     cmd_opts: Union[SimpleNamespace, Namespace],
     base_path: str = PROJECT_PATH,
@@ -89,10 +185,15 @@ class SelectQuery(AsyncIterable):
     """
     Used to send data from PostgreSQL straight to the client
     after recieving it, in parts, without buffering all data
+
+    Rows are read through a server-side cursor, so neither PostgreSQL
+    driver nor the application holds more than `prefetch` rows at once.
     """
 
     PREFETCH = 500
 
+    _cursor_ids = count()
+
     __slots__ = ("query", "conn", "prefetch", "timeout_ms")
 
     def __init__(
@@ -111,10 +212,24 @@ class SelectQuery(AsyncIterable):
         async with self.conn.begin() as _:
             if self.timeout_ms is not None:
                 await self.conn.execute(f"SET statement_timeout = {self.timeout_ms}")
-            async with self.conn.execute(self.query) as cur:
-                while True:
-                    rows = await cur.fetchmany(self.prefetch)
-                    if not rows:
-                        break
-                    for row in rows:
-                        yield row
+
+            # cursor is declared WITHOUT HOLD, so it is closed on commit
+            cursor_name = f"select_query_{next(self._cursor_ids)}"
+            compiled = self.query.compile(
+                dialect=self.conn._dialect,
+                compile_kwargs={"render_postcompile": True},
+            )
+            await self.conn.execute(
+                f"DECLARE {cursor_name} NO SCROLL CURSOR FOR {compiled}",
+                compiled.params,
+            )
+
+            while True:
+                result = await self.conn.execute(
+                    f"FETCH {self.prefetch} FROM {cursor_name}"
+                )
+                rows = await result.fetchall()
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
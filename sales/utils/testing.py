@@ -193,6 +193,40 @@ async def get_products_data(
         return data["products"]
 
 
+async def get_products_page(
+    client: TestClient,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    expected_status: Union[int, EnumMeta] = HTTPStatus.OK,
+    **request_kwargs,
+) -> RecordType:
+    """
+    Get a page of products
+
+    Returns the whole response, i.e. `products` along with `next_cursor`
+    """
+    params = {}
+
+    if limit is not None:
+        params.update({"limit": limit})
+
+    if cursor is not None:
+        params.update({"cursor": cursor})
+
+    response = await client.get(
+        URL(ProductsView.URL_PATH) % params,
+        **request_kwargs,
+    )
+
+    assert response.status == expected_status
+
+    if response.status == HTTPStatus.OK:
+        data = await response.json()
+        errors = ProductsResponseSchema().validate(data)
+        assert errors == {}
+        return data
+
+
 async def post_sales_data(
     client: TestClient,
     date: datetime_date,
@@ -255,6 +289,48 @@ async def get_sales_data(
         return data["sales"]
 
 
+async def get_sales_page(
+    client: TestClient,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    start_date: str = None,
+    end_date: str = None,
+    expected_status: Union[int, EnumMeta] = HTTPStatus.OK,
+    **request_kwargs,
+) -> RecordType:
+    """
+    Get a page of sales
+
+    Returns the whole response, i.e. `sales` along with `next_cursor`
+    """
+    params = {}
+
+    if limit is not None:
+        params.update({"limit": limit})
+
+    if cursor is not None:
+        params.update({"cursor": cursor})
+
+    if start_date:
+        params.update({"start_date": start_date})
+
+    if end_date:
+        params.update({"end_date": end_date})
+
+    response = await client.get(
+        URL(SalesView.URL_PATH) % params,
+        **request_kwargs,
+    )
+
+    assert response.status == expected_status
+
+    if response.status == HTTPStatus.OK:
+        data = await response.json()
+        errors = GetSalesResponseSchema().validate(data)
+        assert errors == {}
+        return data
+
+
 async def get_sale_data(
     client: TestClient,
     sale_id: int,
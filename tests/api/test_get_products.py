@@ -1,5 +1,6 @@
 import pytest
 
+from http import HTTPStatus
 from typing import Tuple, List
 from sqlalchemy.engine import Connection
 
@@ -9,6 +10,7 @@ from sales.utils.testing import (
     generate_products,
     compare_products,
     get_products_data,
+    get_products_page,
 )
 
 
@@ -35,3 +37,35 @@ async def test_get_proudcts(api_client, migrated_postgres_connection, dataset):
 
     actual_products = await get_products_data(api_client)
     assert compare_products(dataset, actual_products)
+
+
+@pytest.mark.asyncio
+async def test_get_products_by_pages(api_client, migrated_postgres_connection):
+    dataset = generate_products(5)
+    import_dataset(migrated_postgres_connection, dataset)
+
+    actual_products, cursor = [], None
+    for expected_page_size in (2, 2, 1):
+        page = await get_products_page(api_client, limit=2, cursor=cursor)
+        assert len(page["products"]) == expected_page_size
+        actual_products.extend(page["products"])
+        cursor = page["next_cursor"]
+
+    assert cursor is None
+    assert len(actual_products) == len(dataset)
+    assert compare_products(dataset, actual_products)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "params",
+    (
+        {"limit": 0},
+        {"limit": "ten"},
+        {"limit": 10, "cursor": "not a cursor"},
+    ),
+)
+async def test_get_products_by_pages_invalid_params(api_client, params):
+    await get_products_page(
+        api_client, **params, expected_status=HTTPStatus.BAD_REQUEST
+    )
@@ -49,3 +49,8 @@ async def test_get_sale(api_client, migrated_postgres_connection):
     actual_sale = await get_sale_data(api_client, sale_id)
 
     assert compare_sales([expected_sale], [actual_sale])
+
+
+@pytest.mark.asyncio
+async def test_get_non_existent_sale(api_client):
+    await get_sale_data(api_client, 999, HTTPStatus.NOT_FOUND)
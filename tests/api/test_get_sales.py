@@ -1,10 +1,13 @@
 import pytest
+import resource
 
 from aiohttp.test_utils import TestClient
 from http import HTTPStatus
 from typing import List
+from sqlalchemy import text
 from sqlalchemy.engine import Connection
 
+from sales.api.routes import SalesView
 from sales.db.schema import (
     product_table,
 )
@@ -13,6 +16,7 @@ from sales.utils.testing import (
     generate_product,
     compare_sales,
     get_sales_data,
+    get_sales_page,
     post_sales_data,
     get_products_data,
 )
@@ -98,3 +102,81 @@ async def test_get_sales_with_params(api_client, migrated_postgres_connection):
         end_date="25.12.2021",
         expected_status=HTTPStatus.BAD_REQUEST,
     )
+
+
+@pytest.mark.asyncio
+async def test_get_sales_by_pages(api_client, migrated_postgres_connection):
+    expected_sales = await setup_test(api_client, migrated_postgres_connection)
+
+    page = await get_sales_page(api_client, limit=3)
+    assert page["next_cursor"] is not None
+    assert compare_sales(expected_sales[:3], page["sales"])
+
+    page = await get_sales_page(api_client, limit=3, cursor=page["next_cursor"])
+    assert page["next_cursor"] is None
+    assert len(page["sales"]) == 1
+    assert compare_sales(expected_sales[3:], page["sales"])
+
+    page = await get_sales_page(
+        api_client, limit=1, start_date="25.12.2021", end_date="25.12.2022"
+    )
+    assert compare_sales(expected_sales[1:2], page["sales"])
+
+    page = await get_sales_page(
+        api_client,
+        limit=1,
+        cursor=page["next_cursor"],
+        start_date="25.12.2021",
+        end_date="25.12.2022",
+    )
+    assert page["next_cursor"] is None
+    assert compare_sales(expected_sales[2:3], page["sales"])
+
+    await get_sales_page(
+        api_client, cursor="bm90IGEgY3Vyc29y", expected_status=HTTPStatus.BAD_REQUEST
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_sales_without_items(api_client):
+    await post_sales_data(api_client, "25.12.2020", [], HTTPStatus.CREATED)
+    actual_sales = await get_sales_data(api_client)
+
+    assert len(actual_sales) == 1
+    assert actual_sales[0]["items"] == []
+
+
+@pytest.mark.asyncio
+async def test_get_sales_memory_is_bounded(api_client, migrated_postgres_connection):
+    """
+    Sales are streamed to the client, so exporting a million of them
+    should not make the process hold the whole result in memory
+    """
+
+    sales_number = 1_000_000
+    max_rss_growth = 100 * 1024 * 1024
+
+    migrated_postgres_connection.execute(
+        text(
+            "INSERT INTO sale (date, amount) "
+            "SELECT date '2020-01-01' + mod(i, 1000), i "
+            "FROM generate_series(1, :sales_number) AS i"
+        ),
+        sales_number=sales_number,
+    )
+
+    # ru_maxrss is measured in kilobytes on Linux
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    response = await api_client.get(SalesView.URL_PATH)
+    assert response.status == HTTPStatus.OK
+
+    sales_count, tail = 0, b""
+    async for chunk in response.content.iter_chunked(64 * 1024):
+        sales_count += (tail + chunk).count(b'"sale_id"')
+        tail = chunk[-len(b'"sale_id"') + 1 :]
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    assert sales_count == sales_number
+    assert rss_after - rss_before < max_rss_growth
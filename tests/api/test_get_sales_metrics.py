@@ -1,3 +1,5 @@
+import asyncio
+import json
 import pytest
 
 from aiohttp.test_utils import TestClient
@@ -7,14 +9,17 @@ from sqlalchemy.engine import Connection
 
 from sales.db.schema import (
     product_table,
+    sale_table,
 )
 from sales.utils.testing import (
     RecordType,
     generate_product,
     get_sales_metrics_data,
     post_sales_data,
+    put_sale_data,
     get_products_data,
 )
+from sales.utils.pg import CACHE_INVALIDATION_CHANNEL
 
 """
 Positive:
@@ -70,6 +75,8 @@ async def setup_test(client: TestClient, connection: Connection) -> List[RecordT
     expected_sales.append({"date": date, "items": items})
     await post_sales_data(client, date, items, HTTPStatus.CREATED)
 
+    return actual_products
+
 
 @pytest.mark.asyncio
 async def test_get_sales_metrics(api_client, migrated_postgres_connection):
@@ -136,3 +143,79 @@ async def test_get_sales_metrics_with_params(api_client, migrated_postgres_conne
         end_date="01.01.2022",
         expected_status=HTTPStatus.BAD_REQUEST,
     )
+
+
+@pytest.mark.asyncio
+async def test_get_sales_metrics_after_update(api_client, migrated_postgres_connection):
+    products = await setup_test(api_client, migrated_postgres_connection)
+    sale = await post_sales_data(
+        api_client,
+        "01.01.2023",
+        [{"product_id": products[0]["product_id"], "quantity": 2}],
+    )
+
+    metrics = await get_sales_metrics_data(api_client, start_date="01.01.2023")
+    assert metrics == {
+        "total_sales": 330.0,
+        "average_sales": 165.0,
+        "sales_trends": {"2023": 330.0},
+    }
+
+    # move the sale to another year and change its amount
+    await put_sale_data(
+        api_client,
+        sale["sale_id"],
+        "01.01.2022",
+        [{"product_id": products[2]["product_id"], "quantity": 1}],
+    )
+
+    # metrics cached for the interval are invalidated by the update
+    metrics = await get_sales_metrics_data(api_client, start_date="01.01.2023")
+    assert metrics == {
+        "total_sales": 30.0,
+        "average_sales": 30.0,
+        "sales_trends": {"2023": 30.0},
+    }
+
+    metrics = await get_sales_metrics_data(api_client, start_date="01.01.2022")
+    assert metrics == {
+        "total_sales": 260.0,
+        "average_sales": 260.0 / 3,
+        "sales_trends": {"2023": 30.0, "2022": 230.0},
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_sales_metrics_after_write_of_another_process(
+    api_client, migrated_postgres_connection
+):
+    await setup_test(api_client, migrated_postgres_connection)
+
+    metrics = await get_sales_metrics_data(api_client, end_date="31.12.2020")
+    assert metrics["total_sales"] == 380.0
+
+    # sale recorded by another API process
+    with migrated_postgres_connection.begin():
+        migrated_postgres_connection.execute(
+            sale_table.insert().values(date="2020-12-25", amount=20)
+        )
+        migrated_postgres_connection.execute(
+            "SELECT pg_notify(%s, %s)",
+            (
+                CACHE_INVALIDATION_CHANNEL,
+                json.dumps({"table": sale_table.name, "keys": ["2020-12-25"]}),
+            ),
+        )
+
+    # notification is delivered asynchronously
+    for _ in range(50):
+        metrics = await get_sales_metrics_data(api_client, end_date="31.12.2020")
+        if metrics["total_sales"] != 380.0:
+            break
+        await asyncio.sleep(0.1)
+
+    assert metrics == {
+        "total_sales": 400.0,
+        "average_sales": 200.0,
+        "sales_trends": {"2020": 400.0},
+    }
@@ -5,6 +5,7 @@ from http import HTTPStatus
 from typing import List
 from sqlalchemy.engine import Connection
 
+from sales.api.routes import SalesView
 from sales.db.schema import (
     product_table,
 )
@@ -13,6 +14,7 @@ from sales.utils.testing import (
     RecordType,
     random_date,
     post_sales_data,
+    get_sale_data,
     generate_product,
     get_products_data,
 )
@@ -121,3 +123,35 @@ async def test_non_existent_product_id(api_client, migrated_postgres_connection)
     ]
 
     await post_sales_data(api_client, random_date(), items, HTTPStatus.NOT_FOUND)
+
+
+@pytest.mark.asyncio
+async def test_duplicate_product_id(api_client, migrated_postgres_connection):
+    products = [generate_product(price=100)]
+    import_products(migrated_postgres_connection, products)
+    actual_products = await get_products_data(api_client)
+
+    product_id = actual_products[0]["product_id"]
+    items = [
+        {"product_id": product_id, "quantity": 1},
+        {"product_id": product_id, "quantity": 2.5},
+    ]
+
+    sale = await post_sales_data(api_client, random_date(), items, HTTPStatus.CREATED)
+    assert sale["amount"] == 350
+
+    sale = await get_sale_data(api_client, sale["sale_id"])
+    assert sale["items"] == [{"product_id": product_id, "quantity": 3.5}]
+
+
+@pytest.mark.asyncio
+async def test_many_non_existent_product_ids(api_client):
+    items = [{"product_id": product_id, "quantity": 1} for product_id in (997, 999)]
+
+    response = await api_client.post(
+        SalesView.URL_PATH, json={"date": random_date(), "items": items}
+    )
+    assert response.status == HTTPStatus.NOT_FOUND
+
+    error = (await response.json())["error"]
+    assert error["fields"] == {"product_ids": [997, 999]}
@@ -0,0 +1,56 @@
+import pytest
+
+from alembic.config import Config
+from alembic.util import CommandError
+from sqlalchemy.engine import Connection
+
+from sales.db.rollup import check_rollup
+from sales.db.schema import sale_table, sale_daily_rollup_table
+
+
+def import_sales(connection: Connection) -> None:
+    connection.execute(
+        sale_table.insert().values(
+            [
+                {"date": "2020-12-25", "amount": 100},
+                {"date": "2020-12-25", "amount": 50},
+                {"date": "2021-12-25", "amount": 30},
+            ]
+        )
+    )
+
+
+def test_rollup_is_maintained(
+    alembic_config: Config, migrated_postgres_connection: Connection
+):
+    import_sales(migrated_postgres_connection)
+    migrated_postgres_connection.execute(
+        sale_table.update()
+        .where(sale_table.c.amount == 30)
+        .values(date="2020-12-25", amount=40)
+    )
+    migrated_postgres_connection.execute(
+        sale_table.delete().where(sale_table.c.amount == 50)
+    )
+
+    rollup = migrated_postgres_connection.execute(
+        sale_daily_rollup_table.select()
+    ).fetchall()
+    assert [tuple(row) for row in rollup] == [
+        (rollup[0]["date"], 2, 140),
+    ]
+
+    check_rollup(alembic_config)
+
+
+def test_rollup_rebuild(
+    alembic_config: Config, migrated_postgres_connection: Connection
+):
+    import_sales(migrated_postgres_connection)
+    migrated_postgres_connection.execute(sale_daily_rollup_table.delete())
+
+    with pytest.raises(CommandError):
+        check_rollup(alembic_config)
+
+    check_rollup(alembic_config, rebuild=True)
+    check_rollup(alembic_config)
@@ -0,0 +1,62 @@
+from datetime import date
+from unittest.mock import patch
+
+from sales.utils.cache import DateRangeCache
+
+
+def test_lru_eviction():
+    cache = DateRangeCache(maxsize=2, ttl=60)
+
+    for key in ("a", "b"):
+        cache.set(key, key, cache.generation)
+    cache.get("a")
+    cache.set("c", "c", cache.generation)
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.stats["evictions"] == 1
+
+
+def test_ttl_expiration():
+    cache = DateRangeCache(maxsize=2, ttl=60)
+
+    with patch("sales.utils.cache.monotonic", return_value=0):
+        cache.set("a", "a", cache.generation)
+        assert cache.get("a") == "a"
+
+    with patch("sales.utils.cache.monotonic", return_value=60):
+        assert cache.get("a") is None
+
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_range_invalidation():
+    cache = DateRangeCache(maxsize=10, ttl=60)
+    ranges = [
+        ("2020-01-01", "2020-12-31"),
+        ("2021-01-01", "2021-12-31"),
+        ("2021-01-01", None),
+        (None, "2020-06-30"),
+        (None, None),
+    ]
+    for start_date, end_date in ranges:
+        cache.set(cache.make_key(start_date, end_date), True, cache.generation)
+
+    cache.invalidate(["2020-07-01", date(2019, 1, 1)])
+
+    assert set(cache._entries) == {
+        (date(2021, 1, 1), date(2021, 12, 31)),
+        (date(2021, 1, 1), None),
+    }
+    assert cache.stats["invalidations"] == 3
+
+
+def test_stale_value_is_not_stored():
+    cache = DateRangeCache(maxsize=10, ttl=60)
+    key = cache.make_key("2020-01-01", "2020-12-31")
+
+    generation = cache.generation
+    cache.invalidate(["2020-07-01"])
+    cache.set(key, "stale", generation)
+
+    assert key not in cache